@@ -1,13 +1,15 @@
 #!.venv/bin/python3
 
+import hmac
+import io
 import os
 import sys
 import tempfile
 import traceback
+import zipfile
 from flask import Flask, render_template, request, send_file
-from extract import PdfExtractor
-from transform import Transformer
-from load import Loader
+from pipeline import Pipeline
+from pipeline.profiling import profile_run_isolated
 import json
 
 app = Flask(__name__)
@@ -18,6 +20,8 @@ ALLOWED_EXTENSIONS = {'pdf', 'xlsx', 'xls'}
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
 
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+# Per-request profiling of /upload is disabled unless an admin token is configured
+app.config['PROFILE_TOKEN'] = os.environ.get('PROFILE_TOKEN')
 
 def get_available_schemas():
     """Get available schemas for the select fields"""
@@ -58,6 +62,20 @@ def get_available_schemas():
     
     return schemas
 
+def profiling_requested():
+    """Whether the request opted in to profiling (`X-Profile: 1` header or `?profile=1`)"""
+    return request.headers.get('X-Profile') == '1' or request.args.get('profile') == '1'
+
+def profiling_authorized():
+    """Check the `X-Profile-Token` header against the configured admin token"""
+    token = app.config.get('PROFILE_TOKEN')
+    if not token:
+        return False
+    # Compare bytes: compare_digest rejects non-ASCII str values. WSGI decodes headers as latin-1,
+    # so encoding back gives the raw bytes the client sent.
+    sent_token = request.headers.get('X-Profile-Token', '').encode('latin-1')
+    return hmac.compare_digest(sent_token, token.encode())
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -67,10 +85,13 @@ def index():
     schemas = get_available_schemas()
     return render_template('index.html', schemas=schemas)
 
-@app.route('/upload', methods=['POST'])
-def upload_file():
+def validate_upload():
+    """
+    Parse and validate the files and selections of an upload form.
+    Returns ((pdf_file, xlsx_file, load_schema_name, extract_schema_name), None) if valid, or (None, error response)
+    """
     if 'pdf_file' not in request.files or 'xlsx_file' not in request.files:
-        return {'error': 'Both PDF and XLSX files are required'}, 400
+        return None, ({'error': 'Both PDF and XLSX files are required'}, 400)
 
     pdf_file = request.files['pdf_file']
     xlsx_file = request.files['xlsx_file']
@@ -81,23 +102,36 @@ def upload_file():
     
     # Check if files were selected
     if pdf_file.filename == '' or xlsx_file.filename == '':
-        return {'error': 'Both PDF and XLSX files must be selected'}, 400
+        return None, ({'error': 'Both PDF and XLSX files must be selected'}, 400)
     
     # Check if waste treatment plant and lab name were selected
     if not load_schema_name:
-        return {'error': 'Waste treatment plant must be selected'}, 400
+        return None, ({'error': 'Waste treatment plant must be selected'}, 400)
     
     if not extract_schema_name:
-        return {'error': 'Lab name must be selected'}, 400
+        return None, ({'error': 'Lab name must be selected'}, 400)
    
     # Check file extensions
     if not (pdf_file and allowed_file(pdf_file.filename) and 
             pdf_file.filename.lower().endswith('.pdf')):
-        return {'error': 'Invalid PDF file'}, 400
+        return None, ({'error': 'Invalid PDF file'}, 400)
     
     if not (xlsx_file and allowed_file(xlsx_file.filename) and 
             xlsx_file.filename.lower().endswith(('.xlsx', '.xls'))):
-        return {'error': 'Invalid XLSX/XLS file'}, 400
+        return None, ({'error': 'Invalid XLSX/XLS file'}, 400)
+    
+    return (pdf_file, xlsx_file, load_schema_name, extract_schema_name), None
+
+@app.route('/upload', methods=['POST'])
+def upload_file():
+    upload, error = validate_upload()
+    if error:
+        return error
+    pdf_file, xlsx_file, load_schema_name, extract_schema_name = upload
+    
+    profile = profiling_requested()
+    if profile and not profiling_authorized():
+        return {'error': 'Profiling is not allowed'}, 403
     
     try:
         # Read files into memory
@@ -120,24 +154,11 @@ def upload_file():
         xlsx_temp.seek(0)
         
         try:
-            # Process the files using existing code
-            pdf_extractor = PdfExtractor(pdf_temp_path, extract_schema_name)
-            extracted_data = {
-                "sampling_date": pdf_extractor.sampling_date,
-                "tables": pdf_extractor.tables,
-                "type": pdf_extractor.type,
-            }
-            
-            transformer = Transformer(pdf_extractor.schemaName, extracted_data)
-            
-            transformed_data = {
-                "type": extracted_data["type"],
-                "sampling_date": transformer.sampling_date,
-                "results": transformer.results,
-            }
-            
-            loader = Loader(xlsx_temp_path, load_schema_name)
-            loader.load(transformed_data)
+            # Process the files through the pipeline
+            pipeline = Pipeline(load_schema_name, extract_schema_name)
+            if profile:
+                return send_profile(pipeline, pdf_temp_path, xlsx_temp_path, xlsx_file.filename)
+            pipeline.run(pdf_temp_path, xlsx_temp_path)
             
             # Return the processed file with proper headers
             response = send_file(
@@ -162,5 +183,58 @@ def upload_file():
         print(traceback.format_exc(), file=sys.stderr)
         return {'error': f'Error processing files: {str(e)}'}, 500
 
+@app.route('/preview', methods=['POST'])
+def preview_upload():
+    """Return the cell writes and row insertions /upload would make, without modifying the workbook"""
+    upload, error = validate_upload()
+    if error:
+        return error
+    pdf_file, xlsx_file, load_schema_name, extract_schema_name = upload
+
+    pdf_temp_path = None
+    xlsx_temp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as pdf_temp:
+            pdf_temp_path = pdf_temp.name
+            pdf_file.save(pdf_temp)
+        with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as xlsx_temp:
+            xlsx_temp_path = xlsx_temp.name
+            xlsx_file.save(xlsx_temp)
+
+        pipeline = Pipeline(load_schema_name, extract_schema_name)
+        plan = pipeline.preview(pdf_temp_path, xlsx_temp_path)
+        return {**plan.as_dict(), 'file_path': xlsx_file.filename}
+
+    except Exception as e:
+        print(traceback.format_exc(), file=sys.stderr)
+        return {'error': f'Error processing files: {str(e)}'}, 500
+
+    finally:
+        # Clean up temporary input files
+        for path in (pdf_temp_path, xlsx_temp_path):
+            if path and os.path.exists(path):
+                os.unlink(path)
+
+def send_profile(pipeline, pdf_path, xlsx_path, xlsx_filename):
+    """Profile the pipeline in a separate process and bundle the processed workbook and its profile into a zip download"""
+    base_name = os.path.splitext(xlsx_filename)[0]
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zf:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            profile_run_isolated(pipeline, pdf_path, xlsx_path, tmp_dir, 'profile')
+            zf.write(xlsx_path, xlsx_filename)
+            zf.write(os.path.join(tmp_dir, 'profile.txt'), f'{base_name}.profile.txt')
+            zf.write(os.path.join(tmp_dir, 'profile.prof'), f'{base_name}.profile.prof')
+    archive.seek(0)
+
+    return send_file(
+        archive,
+        as_attachment=True,
+        download_name=f'{base_name}.profile.zip',
+        mimetype='application/zip',
+        max_age=0
+    )
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -9,7 +9,7 @@ import pdfplumber
 import re
 from typing import List
 from bidi.algorithm import get_display
-from utils import ExtractedTables
+from utils import ExtractedTables, ExtractedReport, ResultRow
 from .schemas import ExtractSchemaManager
 
 def fix_rtl_text(cell: str):
@@ -23,7 +23,7 @@ class PdfExtractor:
   _pdf_content: str
 
   sampling_date: str
-  tables: dict[str, List[dict[str, str | None]]]
+  tables: dict[str, tuple[ResultRow, ...]]
   schemaName: str
   schema: dict
   type: str
@@ -34,6 +34,15 @@ class PdfExtractor:
     self.tables = {}
     self._extract_data()
 
+  @property
+  def report(self) -> ExtractedReport:
+    return ExtractedReport(
+      schema_name=self.schemaName,
+      type=self.type,
+      sampling_date=self.sampling_date,
+      tables=tuple(self.tables.items()),
+    )
+
   def _extract_data(self) -> ExtractedTables:
     with pdfplumber.open(self.pdf_path) as self._pdf:
       self._pdf_content = fix_rtl_text(self._pdf.pages[0].extract_text())
@@ -119,7 +128,7 @@ class PdfExtractor:
         columns_schema = { len(columns_schema): columns_schema }
 
       if len(data) == 0:
-        self.tables[table_name] = []
+        self.tables[table_name] = ()
         return
       
       if len(data[0]) not in columns_schema.keys():
@@ -127,9 +136,14 @@ class PdfExtractor:
       
       columns_schema = columns_schema[len(data[0])]
 
-      self.tables[table_name] = []
-      for row in data:
-        processed_row = {}
-        for col_index, col_name in enumerate(columns_schema):
-          processed_row[col_name] = row[col_index]
-        self.tables[table_name].append(processed_row)
\ No newline at end of file
+      # Only the mapped columns are kept, the rest are never read downstream
+      try:
+        test_name_index = columns_schema.index('testName')
+        result_index = columns_schema.index('result')
+      except ValueError:
+        raise ValueError(f"Table '{table_name}' in schema '{self.schemaName}' must map both 'testName' and 'result' columns")
+
+      self.tables[table_name] = tuple(
+        ResultRow(test_name=row[test_name_index], result=row[result_index])
+        for row in data
+      )
\ No newline at end of file
@@ -2,4 +2,5 @@
 Excel loader package.
 """
 
-from .loader import Loader
\ No newline at end of file
+from .loader import Loader
+from .planner import LoadPlanner
@@ -10,25 +10,29 @@ Assumptions made (should be kept to a minimum):
 
 import datetime
 import sys
-from typing import Any
+from typing import Any, Callable
 from openpyxl import Workbook
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.cell import Cell
 import openpyxl.utils
 from copy import copy
+from utils import TransformedResult, LoadOutcome
 from .schemas import LoadSchemaManager
 from .utils import WorkbookContext
 
 def column_index_from_string(col_letter: str) -> int:
   return openpyxl.utils.column_index_from_string(col_letter) - 1
 
-def extract_date_from_row(r: tuple[Cell], date_column: int) -> datetime.date | None:
-  if type(r[date_column].value) is datetime.date:
-    return r[date_column].value
-  if type(r[date_column].value) is datetime.datetime:
-    return r[date_column].value.date()
+def extract_date_from_value(value: Any) -> datetime.date | None:
+  if type(value) is datetime.date:
+    return value
+  if type(value) is datetime.datetime:
+    return value.date()
   return None
 
+def extract_date_from_row(r: tuple[Cell], date_column: int) -> datetime.date | None:
+  return extract_date_from_value(r[date_column].value)
+
 schemaManager = LoadSchemaManager()
 
 class Loader:
@@ -38,8 +42,15 @@ class Loader:
   worksheet: Worksheet
   schema: dict
   sheet_schema: Any
+  on_open: Callable[[Workbook], None] | None
+  before_save: Callable[[Workbook], None] | None
 
-  def __init__(self, file_path: str, schema_name: str):
+  def __init__(self, file_path: str, schema_name: str, on_open: Callable[[Workbook], None] = None, before_save: Callable[[Workbook], None] = None):
+    """
+    `on_open` and `before_save` are passed on to `WorkbookContext`.
+    """
+    self.on_open = on_open
+    self.before_save = before_save
     self.schema = schemaManager.get_schema(schema_name)
     if not self.schema:
       raise ValueError(f"No schema found for name: {schema_name}")
@@ -144,19 +155,31 @@ class Loader:
 
     return self.worksheet[row_index]
   
-  def load(self, data: dict):
-    self.sheet_schema = self.schema.get('sheets', {}).get(data['type'])
+  def load(self, data: TransformedResult) -> LoadOutcome:
+    self.sheet_schema = self.schema.get('sheets', {}).get(data.type)
     if not self.sheet_schema:
-      raise ValueError(f"No sheet defined for type: {data['type']}")
+      raise ValueError(f"No sheet defined for type: {data.type}")
     
-    with WorkbookContext(self.file_path) as self.workbook:
+    results = dict(data.results)
+    written_fields = []
+    row_index = None
+    with WorkbookContext(self.file_path, self.on_open, self.before_save) as self.workbook:
       self.worksheet = self.workbook[self.sheet_schema['name']]
-      row = self._get_row(data['sampling_date'].date())
+      row = self._get_row(data.sampling_date.date())
       if not row:
-        print(f'No existing row found for date {data["sampling_date"]}', file=sys.stderr)
-        return
-
-      for field, field_schema in self.sheet_schema.get('fields', {}).items():
-        if field in data["results"]:
-          col_index = column_index_from_string(field_schema['column'])
-          row[col_index].value = data["results"][field]
+        print(f'No existing row found for date {data.sampling_date}', file=sys.stderr)
+      else:
+        row_index = row[0].row
+        for field, field_schema in self.sheet_schema.get('fields', {}).items():
+          if field in results:
+            col_index = column_index_from_string(field_schema['column'])
+            row[col_index].value = results[field]
+            written_fields.append(field)
+
+    return LoadOutcome(
+      file_path=self.file_path,
+      sheet_name=self.sheet_schema['name'],
+      sampling_date=data.sampling_date,
+      row=row_index,
+      fields=tuple(written_fields),
+    )
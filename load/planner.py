@@ -0,0 +1,105 @@
+"""
+Dry-run planner for the excel loader.
+
+Works out which row `Loader.load` would write to, which rows it would insert
+and which cells it would change, by streaming the sheet in read-only mode.
+Only one row is held in memory at a time and the workbook is never saved.
+
+Makes the same assumptions as the loader (see `loader.py`).
+"""
+
+import datetime
+from typing import Any
+from utils import TransformedResult, LoadPlan, PlannedInsertion, PlannedWrite
+from .loader import column_index_from_string, extract_date_from_value, schemaManager
+from .utils import ReadOnlyWorkbookContext
+
+class LoadPlanner:
+
+  file_path: str
+  schema: dict
+  sheet_schema: Any
+
+  def __init__(self, file_path: str, schema_name: str):
+    self.schema = schemaManager.get_schema(schema_name)
+    if not self.schema:
+      raise ValueError(f"No schema found for name: {schema_name}")
+    self.file_path = file_path
+
+  def plan(self, data: TransformedResult) -> LoadPlan:
+    self.sheet_schema = self.schema.get('sheets', {}).get(data.type)
+    if not self.sheet_schema:
+      raise ValueError(f"No sheet defined for type: {data.type}")
+
+    results = dict(data.results)
+    fields = [
+      (field, field_schema['column'], column_index_from_string(field_schema['column']), results[field])
+      for field, field_schema in self.sheet_schema.get('fields', {}).items()
+      if field in results
+    ]
+    date_column = column_index_from_string(self.sheet_schema.get("fields", {}).get("date", {}).get("column", "A"))
+    min_date_row = self.sheet_schema.get('headerRowCount', 0) + 1
+    date = data.sampling_date.date()
+
+    previous_date = None # last date before `date`
+    next_row, next_date = None, None # first row and date after `date`
+    max_date_row = None
+
+    with ReadOnlyWorkbookContext(self.file_path) as workbook:
+      worksheet = workbook[self.sheet_schema['name']]
+      for row_idx, values in enumerate(worksheet.iter_rows(min_row=min_date_row, values_only=True), start=min_date_row):
+        row_date = extract_date_from_value(values[date_column]) if date_column < len(values) else None
+        if row_date is None:
+          continue
+        max_date_row = row_idx
+        if next_row is not None:
+          # Past the target date, only the last date row is still needed
+          continue
+
+        if row_date == date:
+          current_values = [values[col_index] if col_index < len(values) else None for _, _, col_index, _ in fields]
+          return self._make_plan(data, row_idx, (), fields, current_values)
+        elif row_date < date:
+          previous_date = row_date
+        else:
+          next_row, next_date = row_idx, row_date
+
+    if max_date_row is None:
+      raise Exception('Could not find a date row')
+
+    if not self.sheet_schema.get("addMissingRows", True):
+      return self._make_plan(data, None, (), fields, None)
+
+    # Same bounds as Loader._get_row
+    one_day = datetime.timedelta(days=1)
+    start = next_row if next_row is not None else max_date_row + 1
+    start_date = previous_date if previous_date is not None else date - one_day
+    end_date = date if start >= max_date_row else next_date - one_day
+
+    insertions = tuple(
+      PlannedInsertion(row=start + offset, date=start_date + one_day * (offset + 1))
+      for offset in range((end_date - start_date).days)
+    )
+    row = start + (date - start_date).days - 1
+    return self._make_plan(data, row, insertions, fields, None)
+
+  def _make_plan(self, data: TransformedResult, row: int | None, insertions: tuple[PlannedInsertion, ...], fields: list, current_values: list | None) -> LoadPlan:
+    writes = ()
+    if row is not None:
+      writes = tuple(
+        PlannedWrite(
+          cell=f'{column}{row}',
+          field=field,
+          value=value,
+          current_value=current_values[i] if current_values is not None else None,
+        )
+        for i, (field, column, _, value) in enumerate(fields)
+      )
+    return LoadPlan(
+      file_path=self.file_path,
+      sheet_name=self.sheet_schema['name'],
+      sampling_date=data.sampling_date,
+      row=row,
+      insertions=insertions,
+      writes=writes,
+    )
@@ -1,14 +1,40 @@
 from openpyxl import load_workbook
 
 class WorkbookContext:
-    def __init__(self, filename):
+    """
+    Opens the workbook for writing and saves it on exit.
+    `on_open` is called with the workbook once it is loaded, and `before_save`
+    right before it is saved (e.g. for profiling).
+    """
+    def __init__(self, filename, on_open=None, before_save=None):
         self.filename = filename
+        self.on_open = on_open
+        self.before_save = before_save
         self.wb = None
 
     def __enter__(self):
         self.wb = load_workbook(self.filename)
+        if self.on_open:
+            self.on_open(self.wb)
         return self.wb
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.before_save:
+            self.before_save(self.wb)
         self.wb.save(self.filename)
         self.wb.close()
+
+class ReadOnlyWorkbookContext:
+    """
+    Opens the workbook in openpyxl's read-only streaming mode. Nothing is saved on exit.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.wb = None
+
+    def __enter__(self):
+        self.wb = load_workbook(self.filename, read_only=True)
+        return self.wb
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.wb.close()
@@ -1,39 +1,67 @@
 #!.venv/bin/python3
 
-from extract import PdfExtractor
-from transform import Transformer
-from load import Loader
+from pipeline import Pipeline
+from pipeline.profiling import profile_run
+import argparse
+import json
 import os
 
+EXAMPLES_DIR = "examples"
+
 def get_all_example_files():
   """
   Walk through the 'examples' directory and yield all file paths.
   """
-  examples_dir = "examples"
-  for root, dirs, files in os.walk(examples_dir):
+  for root, dirs, files in os.walk(EXAMPLES_DIR):
     for file in files:
       if file.endswith('.pdf'):
         yield os.path.join(root, file)
 
 
+def parse_args():
+  parser = argparse.ArgumentParser(description="Load all example PDF reports into output.xlsx")
+  mode = parser.add_mutually_exclusive_group()
+  mode.add_argument(
+    '--profile',
+    nargs='?',
+    const='profiles',
+    default=None,
+    metavar='DIR',
+    help="Profile each file (cProfile + tracemalloc) and write the stats to DIR (default: profiles)",
+  )
+  mode.add_argument(
+    '--dry-run',
+    action='store_true',
+    help="Print the planned cell writes and row insertions as JSON without modifying output.xlsx. "
+         "Each file is planned on its own against the current output.xlsx: plans are not cumulative, "
+         "so rows inserted for one file are not accounted for in the row numbers of the next",
+  )
+  return parser.parse_args()
+
+
 def main():
-  for pdf_path in get_all_example_files():
-    pdf_extractor = PdfExtractor(pdf_path)
-    extracted_data = {
-      "sampling_date": pdf_extractor.sampling_date,
-      "tables": pdf_extractor.tables,
-      "type": pdf_extractor.type,
-    }
-    transformer = Transformer(pdf_extractor.schemaName, extracted_data)
-
-    transformed_data = {
-      "type": extracted_data["type"],
-      "sampling_date": transformer.sampling_date,
-      "results": transformer.results,
-    }
-
-    loader = Loader('output.xlsx', 'acre')
-    loader.load(transformed_data)
+  args = parse_args()
+  pipeline = Pipeline('acre')
+
+  if args.dry_run:
+    for pdf_path in get_all_example_files():
+      plan = pipeline.preview(pdf_path, 'output.xlsx')
+      print(json.dumps({ 'pdf_path': pdf_path, **plan.as_dict() }, ensure_ascii=False, indent=2))
+    return
+
+  if args.profile:
+    for pdf_path in get_all_example_files():
+      profile = profile_run(pipeline, pdf_path, 'output.xlsx')
+      name = os.path.splitext(os.path.relpath(pdf_path, EXAMPLES_DIR))[0].replace(os.sep, '_')
+      profile.dump(args.profile, name)
+      print(f"Profiled {pdf_path} in {profile.wall_time:.3f}s, stats written to {os.path.join(args.profile, name)}.txt")
+    return
+
+  for outcome in pipeline.run_many(get_all_example_files(), 'output.xlsx'):
+    if outcome.row is None:
+      print(f"Skipped {outcome.sampling_date.date().isoformat()}: no row in '{outcome.sheet_name}' and adding missing rows is disabled")
+    else:
+      print(f"Loaded {len(outcome.fields)} fields into '{outcome.sheet_name}' row {outcome.row}")
 
 if __name__ == "__main__":
   main()
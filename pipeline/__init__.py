@@ -0,0 +1,5 @@
+"""
+Extract -> transform -> load pipeline package.
+"""
+
+from .pipeline import Pipeline
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""
+Pipeline running a PDF report through the extract, transform and load stages.
+
+Each stage hands the next one a frozen record (see `utils.records`), so the
+intermediate results can be inspected, pickled or sent to another process.
+"""
+
+from typing import Callable, Iterable, Iterator
+from openpyxl import Workbook
+from extract import PdfExtractor
+from transform import Transformer
+from load import Loader, LoadPlanner
+from utils import ExtractedReport, TransformedResult, LoadOutcome, LoadPlan
+
+class Pipeline:
+
+  load_schema_name: str
+  extract_schema_name: str | None
+
+  def __init__(self, load_schema_name: str, extract_schema_name: str = None):
+    """
+    `extract_schema_name` is auto-detected from the PDF content when omitted.
+    """
+    self.load_schema_name = load_schema_name
+    self.extract_schema_name = extract_schema_name
+
+  def extract(self, pdf_path: str) -> ExtractedReport:
+    return PdfExtractor(pdf_path, self.extract_schema_name).report
+
+  def transform(self, report: ExtractedReport) -> TransformedResult:
+    return Transformer(report.schema_name, report).result
+
+  def load(self, result: TransformedResult, xlsx_path: str, on_open: Callable[[Workbook], None] = None, before_save: Callable[[Workbook], None] = None) -> LoadOutcome:
+    """
+    `on_open` and `before_save` are optional `WorkbookContext` callbacks.
+    """
+    return Loader(xlsx_path, self.load_schema_name, on_open, before_save).load(result)
+
+  def plan(self, result: TransformedResult, xlsx_path: str) -> LoadPlan:
+    return LoadPlanner(xlsx_path, self.load_schema_name).plan(result)
+
+  def run(self, pdf_path: str, xlsx_path: str) -> LoadOutcome:
+    return self.load(self.transform(self.extract(pdf_path)), xlsx_path)
+
+  def run_many(self, pdf_paths: Iterable[str], xlsx_path: str) -> Iterator[LoadOutcome]:
+    """
+    Lazily run every PDF in `pdf_paths` into the same workbook, one at a time.
+    """
+    for pdf_path in pdf_paths:
+      yield self.run(pdf_path, xlsx_path)
+
+  def preview(self, pdf_path: str, xlsx_path: str) -> LoadPlan:
+    """
+    Plan the writes `run` would make, without modifying the workbook.
+    """
+    return self.plan(self.transform(self.extract(pdf_path)), xlsx_path)
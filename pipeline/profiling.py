@@ -0,0 +1,202 @@
+"""
+Profiling helpers for the pipeline.
+
+Runs a single PDF through the pipeline under cProfile and tracemalloc, and
+summarizes the time and memory spent in the `PdfExtractor`, `Transformer`,
+`Loader` and `WorkbookContext` stages.
+"""
+
+import cProfile
+import io
+import multiprocessing
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from extract import PdfExtractor
+from transform import Transformer
+from load import Loader
+from openpyxl import Workbook
+from load.utils import WorkbookContext
+from utils import LoadOutcome
+from .pipeline import Pipeline
+
+# Stage name -> function whose cProfile entry is reported for the stage
+STAGE_FUNCTIONS = {
+  'PdfExtractor': PdfExtractor.__init__,
+  'Transformer': Transformer.__init__,
+  'Loader': Loader.load,
+  'WorkbookContext (open)': WorkbookContext.__enter__,
+  'WorkbookContext (save)': WorkbookContext.__exit__,
+}
+
+# Allocation sites left out of the snapshots
+IGNORED_FILES = {
+  tracemalloc.__file__,
+  __file__,
+  '<frozen importlib._bootstrap>',
+  '<frozen importlib._bootstrap_external>',
+}
+
+# tracemalloc is process wide: only one profiled run may be active at a time,
+# and pipeline runs in other threads of the same process are counted too
+# (see `profile_run_isolated`).
+_lock = threading.Lock()
+
+def _format_size(size: int) -> str:
+  return f'{size / 1024:.1f} KiB'
+
+def _stats_key(function) -> tuple[str, int, str]:
+  code = function.__code__
+  return code.co_filename, code.co_firstlineno, code.co_name
+
+class PipelineProfile:
+  pdf_path: str
+  xlsx_path: str
+  outcome: LoadOutcome
+  stats: pstats.Stats
+  wall_time: float
+  stage_peaks: dict[str, int]
+  peak_memory: int
+  top_allocations: dict[str, list[tracemalloc.Statistic]]
+  load_snapshot_time: float
+
+  def __init__(self, pdf_path: str, xlsx_path: str, top_allocations: int = 10):
+    self._top_allocations = top_allocations
+    self.pdf_path = pdf_path
+    self.xlsx_path = xlsx_path
+    self.stage_peaks = {}
+    self.top_allocations = {}
+    self.load_snapshot_time = 0.0
+    self._segment_peaks = []
+
+  def _start_stage(self) -> None:
+    self._segment_peaks = []
+    tracemalloc.reset_peak()
+
+  def _end_segment(self) -> int:
+    """
+    Close the current measuring segment and return its peak memory.
+    Inner stages (e.g. `WorkbookContext`) reset the peak, so the peak of the
+    outer stage is the max of all its segments.
+    """
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    self._segment_peaks.append(peak)
+    return peak
+
+  def _end_stage(self, stage: str) -> None:
+    self._end_segment()
+    self.stage_peaks[stage] = max(self._segment_peaks)
+
+  def _record_peak(self, stage: str, peak: int) -> None:
+    self.stage_peaks[stage] = max(peak, self.stage_peaks.get(stage, 0))
+
+  def _on_open(self, workbook: Workbook) -> None:
+    self._record_peak('WorkbookContext (open)', self._end_segment())
+
+  def _before_save(self, workbook: Workbook) -> None:
+    snapshot_start = time.perf_counter()
+    self._take_snapshot('Top allocation sites (Loader, workbook open before save)', self._top_allocations)
+    self.load_snapshot_time += time.perf_counter() - snapshot_start
+    self._end_segment()
+
+  def _take_snapshot(self, label: str, limit: int) -> None:
+    # Filtering the grouped statistics is much cheaper than `Snapshot.filter_traces` on large workbooks
+    statistics = tracemalloc.take_snapshot().statistics('lineno')
+    self.top_allocations[label] = [
+      stat for stat in statistics if stat.traceback[0].filename not in IGNORED_FILES
+    ][:limit]
+
+  def _stage_stats(self, function) -> tuple[int, float]:
+    """
+    Return the call count and cumulative time of a function in the profile.
+    """
+    _, nc, _, ct, _ = self.stats.stats.get(_stats_key(function), (0, 0, 0, 0.0, None))
+    return nc, ct
+
+  def format(self, top: int = 20) -> str:
+    out = io.StringIO()
+    out.write(f'Profile of {self.pdf_path} -> {self.xlsx_path}\n')
+    out.write(f'Wall time: {self.wall_time:.3f}s, peak memory: {_format_size(self.peak_memory)}\n\n')
+
+    out.write(f'{"Stage":<26}{"Calls":>8}{"Cumulative (s)":>16}{"Peak memory":>16}\n')
+    for stage, function in STAGE_FUNCTIONS.items():
+      calls, cumtime = self._stage_stats(function)
+      peak = self.stage_peaks.get(stage)
+      peak = _format_size(peak) if peak is not None else '-'
+      out.write(f'{stage:<26}{calls:>8}{cumtime:>16.3f}{peak:>16}\n')
+    out.write(f'(Loader and WorkbookContext (save) include {self.load_snapshot_time:.3f}s spent taking the Loader allocation snapshot)\n')
+
+    for label, statistics in self.top_allocations.items():
+      out.write(f'\n{label}:\n')
+      for stat in statistics:
+        out.write(f'  {stat}\n')
+
+    out.write('\nTop functions by cumulative time:\n')
+    self.stats.stream = out
+    self.stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    return out.getvalue()
+
+  def dump(self, directory: str, name: str) -> None:
+    """
+    Write `<name>.txt` (human readable summary) and `<name>.prof` (raw pstats data) to `directory`.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f'{name}.txt'), 'w', encoding='utf-8') as f:
+      f.write(self.format())
+    self.stats.dump_stats(os.path.join(directory, f'{name}.prof'))
+
+def profile_run(pipeline: Pipeline, pdf_path: str, xlsx_path: str, top_allocations: int = 10) -> PipelineProfile:
+  """
+  Run a single PDF through `pipeline` while profiling it.
+  """
+  profile = PipelineProfile(pdf_path, xlsx_path, top_allocations)
+  profiler = cProfile.Profile()
+
+  with _lock:
+    tracemalloc.start()
+    try:
+      start = time.perf_counter()
+      profiler.enable()
+      try:
+        profile._start_stage()
+        report = pipeline.extract(pdf_path)
+        profile._end_stage('PdfExtractor')
+        profile._take_snapshot('Top allocation sites (PdfExtractor, extracted report alive)', top_allocations)
+
+        profile._start_stage()
+        result = pipeline.transform(report)
+        profile._end_stage('Transformer')
+        profile._take_snapshot('Top allocation sites (Transformer, transformed result alive)', top_allocations)
+
+        # The WorkbookContext callbacks split the stage into segments: up to the
+        # end of the open, the work on the open workbook, and the save
+        profile._start_stage()
+        profile.outcome = pipeline.load(result, xlsx_path, profile._on_open, profile._before_save)
+        profile._record_peak('WorkbookContext (save)', profile._end_segment())
+        profile._end_stage('Loader')
+      finally:
+        profiler.disable()
+        profile.wall_time = time.perf_counter() - start
+
+      profile._take_snapshot('Retained allocations (end of run)', top_allocations)
+    finally:
+      tracemalloc.stop()
+
+  profile.peak_memory = max(profile.stage_peaks.values())
+  profile.stats = pstats.Stats(profiler)
+  return profile
+
+def _profile_to_directory(pipeline: Pipeline, pdf_path: str, xlsx_path: str, directory: str, name: str) -> None:
+  profile_run(pipeline, pdf_path, xlsx_path).dump(directory, name)
+
+def profile_run_isolated(pipeline: Pipeline, pdf_path: str, xlsx_path: str, directory: str, name: str) -> None:
+  """
+  Run `profile_run` in a separate process and dump its results to `directory` (see `PipelineProfile.dump`).
+  Used by the web app, so concurrent requests are not counted in the profile.
+  """
+  with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+    executor.submit(_profile_to_directory, pipeline, pdf_path, xlsx_path, directory, name).result()
@@ -6,6 +6,7 @@ Assumptions made (should be kept to a minimum):
 
 from datetime import datetime
 import sys
+from utils import ExtractedReport, TransformedResult
 from .schemas import TransformSchemaManager
 schemaManager = TransformSchemaManager()
 
@@ -14,26 +15,32 @@ class Transformer:
   sampling_date: datetime
   results: dict
 
-  def __init__(self, schema_name: str, data: dict):
+  def __init__(self, schema_name: str, data: ExtractedReport):
     self.schema = schemaManager.get_schema(schema_name)
     if not self.schema:
       raise ValueError(f"No schema found for name: {schema_name}")
     self.input_data = data
     self._transform()
 
+  @property
+  def result(self) -> TransformedResult:
+    return TransformedResult(
+      type=self.input_data.type,
+      sampling_date=self.sampling_date,
+      results=tuple(self.results.items()),
+    )
+
   def _transform(self) -> dict:
     if not self.schema:
       raise ValueError("Schema is not defined for transformation")
-    if not self.input_data:
-      raise ValueError("Input data cannot be empty")
     self._transform_sampling_date()
     self._transform_results_table()
     
   def _transform_sampling_date(self) -> None:
     date_format = self.schema.get('dateFormat', "%d/%m/%y")
-    if 'sampling_date' in self.input_data:
+    if self.input_data.sampling_date:
       try:
-        self.sampling_date = datetime.strptime(self.input_data['sampling_date'], date_format)
+        self.sampling_date = datetime.strptime(self.input_data.sampling_date, date_format)
       except ValueError as e:
         raise ValueError(f"Invalid sampling date format: {e}")
     else:
@@ -43,15 +50,15 @@ class Transformer:
     results_schema = self.schema.get("tables").get("results")
     if not results_schema:
       raise ValueError("Results table schema is not defined")
-    results_table = self.input_data.get('tables', {}).get('results', [])
+    results_table = self.input_data.table('results')
 
     self.results = {}
 
     test_names = results_schema.get('testNames', {})
     for row in results_table:
-      test_name = row.get('testName')
+      test_name = row.test_name
       if test_name in test_names:
-        value = row.get('result')
+        value = row.result
         try:
           value = float(value)
         except (ValueError, TypeError):
@@ -2,4 +2,5 @@
 Utility functions and types
 """
 
-from .types import *
\ No newline at end of file
+from .types import *
+from .records import *
\ No newline at end of file
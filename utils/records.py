@@ -0,0 +1,121 @@
+"""
+Record types passed between the pipeline stages.
+
+All records are frozen and slotted so they stay small in batch runs and are
+cheap to pickle across process boundaries.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any
+
+__all__ = [
+  'ResultRow',
+  'ExtractedReport',
+  'TransformedResult',
+  'LoadOutcome',
+  'PlannedWrite',
+  'PlannedInsertion',
+  'LoadPlan',
+]
+
+
+@dataclass(frozen=True, slots=True)
+class ResultRow:
+  """A single extracted table row, reduced to the columns the transformer reads."""
+  test_name: str | None
+  result: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class ExtractedReport:
+  """Output of `PdfExtractor`. `tables` holds `(table name, rows)` pairs."""
+  schema_name: str
+  type: str
+  sampling_date: str
+  tables: tuple[tuple[str, tuple[ResultRow, ...]], ...]
+
+  def table(self, name: str) -> tuple[ResultRow, ...]:
+    """Rows of the table `name`, empty if it was not extracted."""
+    for table_name, rows in self.tables:
+      if table_name == name:
+        return rows
+    return ()
+
+
+@dataclass(frozen=True, slots=True)
+class TransformedResult:
+  """Output of `Transformer`. `results` holds `(standardized test name, value)` pairs."""
+  type: str
+  sampling_date: datetime
+  results: tuple[tuple[str, float | str | None], ...]
+
+
+@dataclass(frozen=True, slots=True)
+class LoadOutcome:
+  """Output of `Loader.load`. `row` is None when no row was found or added for the date."""
+  file_path: str
+  sheet_name: str
+  sampling_date: datetime
+  row: int | None
+  fields: tuple[str, ...]
+
+
+def _json_value(value: Any) -> Any:
+  """
+  Convert a cell value read by openpyxl (e.g. date, time or timedelta) to a JSON serializable value.
+  """
+  if value is None or isinstance(value, (str, int, float, bool)):
+    return value
+  if hasattr(value, 'isoformat'):
+    return value.isoformat()
+  return str(value)
+
+
+@dataclass(frozen=True, slots=True)
+class PlannedWrite:
+  """A cell `Loader.load` would write. `current_value` is None for cells of inserted rows."""
+  cell: str
+  field: str
+  value: float | str | None
+  current_value: Any
+
+
+@dataclass(frozen=True, slots=True)
+class PlannedInsertion:
+  """A row `Loader.load` would insert, dated `date`, at its final row index."""
+  row: int
+  date: date
+
+
+@dataclass(frozen=True, slots=True)
+class LoadPlan:
+  """Output of `LoadPlanner.plan`: what `Loader.load` would do, without touching the workbook."""
+  file_path: str
+  sheet_name: str
+  sampling_date: datetime
+  row: int | None
+  insertions: tuple[PlannedInsertion, ...]
+  writes: tuple[PlannedWrite, ...]
+
+  def as_dict(self) -> dict:
+    """JSON serializable representation of the plan."""
+    return {
+      'file_path': self.file_path,
+      'sheet_name': self.sheet_name,
+      'sampling_date': self.sampling_date.date().isoformat(),
+      'row': self.row,
+      'insertions': [
+        { 'row': insertion.row, 'date': insertion.date.isoformat() }
+        for insertion in self.insertions
+      ],
+      'writes': [
+        {
+          'cell': write.cell,
+          'field': write.field,
+          'value': write.value,
+          'current_value': _json_value(write.current_value),
+        }
+        for write in self.writes
+      ],
+    }